@@ -5,41 +5,80 @@ It walks the SDK source tree and creates virtual Markdown files
 with mkdocstrings directives for each module.
 """
 
+import logging
+import os
+import re
+import sys
+from collections.abc import Iterator
 from pathlib import Path
+
 import mkdocs_gen_files
 
-# Navigation builder for literate-nav
-nav = mkdocs_gen_files.Nav()
+log = logging.getLogger("mkdocs.plugins.gen_ref_pages")
 
 # Path to the cloned SDK source (relative to docs/ directory)
 src = Path(__file__).parent.parent / "tmp" / "python-sdk" / "src"
+src_str = str(src)
 
 # Package name (adjust if your package has a different name)
 PACKAGE_NAME = "griddy"
 
+# Breadcrumbs on nested module pages; set GRIDDY_DOCS_BREADCRUMBS=0 to skip them
+GEN_BREADCRUMBS = os.environ.get("GRIDDY_DOCS_BREADCRUMBS", "1") == "1"
+
+# Special case titles for well-known module names
+TITLE_MAP = {
+    "auth": "Authentication",
+    "api": "API Client",
+    "cli": "Command Line Interface",
+    "utils": "Utilities",
+    "config": "Configuration",
+    "exc": "Exceptions",
+    "exceptions": "Exceptions",
+    "types": "Type Definitions",
+    "models": "Data Models",
+    "endpoints": "API Endpoints",
+    "client": "Client",
+}
+
+# mkdocstrings directives for package index pages and regular module pages,
+# kept as bytes so pages are assembled and written without re-encoding
+_PACKAGE_TMPL = b"""::: %b
+    options:
+      show_root_heading: false
+      show_root_toc_entry: false
+      members: false
+
+---
+
+## Module Contents
+
+::: %b
+    options:
+      show_root_heading: false
+      show_submodules: false
+"""
+_MODULE_TMPL = b"::: %b\n"
+
 # Manual overrides - these files exist in the repo and should not be auto-generated
 # This allows you to write custom documentation for key modules
 MANUAL_OVERRIDES = {
     # "griddy/index.md",  # Uncomment to use a hand-crafted package overview
 }
 
+# Package and module names excluded from the reference (whole subtrees for packages):
+# private names starting with "_", plus tests, test, scripts and migrations
+_SKIP_RE = re.compile(r"(?:_|tests?$|scripts$|migrations$)").match
 
-def should_skip_module(parts: tuple[str, ...]) -> bool:
-    """Determine if a module should be skipped."""
-    # Skip private modules (starting with _) except __init__
-    for part in parts:
-        if part.startswith("_") and part != "__init__":
-            return True
-
-    # Skip test modules
-    if "tests" in parts or "test" in parts:
-        return True
 
-    # Skip migration/script modules if present
-    if "scripts" in parts or "migrations" in parts:
-        return True
+def should_skip_module(name: str) -> bool:
+    """Determine if a module file should be skipped.
 
-    return False
+    Excluded directories are already pruned by walk_py, so only the
+    module's own name needs checking here.
+    """
+    # Skip private and test/script/migration modules, but keep package __init__
+    return name != "__init__" and _SKIP_RE(name) is not None
 
 
 def get_module_title(parts: tuple[str, ...], is_package: bool) -> str:
@@ -49,109 +88,154 @@ def get_module_title(parts: tuple[str, ...], is_package: bool) -> str:
 
     name = parts[-1]
 
-    # Special case titles
-    title_map = {
-        "auth": "Authentication",
-        "api": "API Client",
-        "cli": "Command Line Interface",
-        "utils": "Utilities",
-        "config": "Configuration",
-        "exc": "Exceptions",
-        "exceptions": "Exceptions",
-        "types": "Type Definitions",
-        "models": "Data Models",
-        "endpoints": "API Endpoints",
-        "client": "Client",
-    }
-
-    if name in title_map:
-        return title_map[name]
+    if name in TITLE_MAP:
+        return TITLE_MAP[name]
 
     # Convert snake_case to Title Case
     return name.replace("_", " ").title()
 
 
-# Walk the source tree
-for path in sorted(src.rglob("*.py")):
-    # Get module path relative to src
-    module_path = path.relative_to(src).with_suffix("")
-
-    # Convert to documentation path
-    doc_path = path.relative_to(src).with_suffix(".md")
-    full_doc_path = Path("sdk-reference/python", doc_path)
-
-    # Build the module identifier parts
-    parts = tuple(module_path.parts)
-
-    # Skip modules that should be excluded
-    if should_skip_module(parts):
-        continue
-
-    # Handle __init__.py files (package index)
-    is_package = parts[-1] == "__init__"
-    if is_package:
-        parts = parts[:-1]
-        if not parts:
-            # Root package __init__.py
-            doc_path = Path("index.md")
-            full_doc_path = Path("sdk-reference/python/index.md")
+def walk_py(root: str) -> Iterator[str]:
+    """Yield the paths of Python files under root, pruning skipped directories.
+
+    Uses Path.walk on Python 3.12+, which walks with strings internally,
+    otherwise os.fwalk where available (POSIX) so directories are listed
+    through file descriptors, falling back to os.walk. Excluded subtrees
+    are pruned in place and never descended into.
+    """
+    if sys.version_info >= (3, 12):
+        tree = Path(root).walk()
+    elif hasattr(os, "fwalk"):
+        tree = (
+            (dirpath, dirnames, filenames)
+            for dirpath, dirnames, filenames, _ in os.fwalk(root)
+        )
+    else:
+        tree = os.walk(root)
+
+    for dirpath, dirnames, filenames in tree:
+        dirnames[:] = [d for d in dirnames if not _SKIP_RE(d)]
+        for name in filenames:
+            if name.endswith(".py"):
+                yield os.path.join(dirpath, name)
+
+
+def write_if_changed(name: str, content: bytes) -> None:
+    """Write a generated file, leaving it untouched if the content is identical.
+
+    This only applies when the script runs standalone and writes into the
+    real docs_dir: skipping byte-identical writes keeps mtimes stable there.
+    During a MkDocs build gen-files writes into a fresh temp directory, and
+    every page must go through mkdocs_gen_files.open to be registered.
+    """
+    if mkdocs_gen_files.directory == mkdocs_gen_files.config.docs_dir:
+        existing = Path(mkdocs_gen_files.directory, name)
+        try:
+            if existing.read_bytes() == content:
+                return
+        except FileNotFoundError:
+            pass
+
+    with mkdocs_gen_files.open(name, "wb") as fd:
+        fd.write(content)
+
+
+def render_pages(py_files: list[str]) -> tuple[list[tuple[str, bytes, str]], bytes]:
+    """Render a reference page for each module, plus the literate-nav SUMMARY.md.
+
+    Returns (full_doc_path, content, edit_path) tuples and the SUMMARY.md text.
+    """
+    pages = []
+    nav_entries = []
+
+    # Edit paths are relative to the directory holding the SDK checkout
+    edit_prefix = src.relative_to(src.parent.parent).as_posix() + "/"
+
+    for path_str in py_files:
+        # Get module path relative to src ("/"-separated, without the .py suffix)
+        module_path = path_str[len(src_str) + 1 : -3].replace(os.sep, "/")
+
+        # Build the module identifier parts
+        parts = tuple(module_path.split("/"))
+
+        # Skip modules that should be excluded
+        if should_skip_module(parts[-1]):
+            continue
+
+        # Handle __init__.py files (package index)
+        is_package = parts[-1] == "__init__"
+        if is_package:
+            parts = parts[:-1]
+            doc_path = "/".join((*parts, "index.md"))
         else:
-            doc_path = doc_path.with_name("index.md")
-            full_doc_path = full_doc_path.with_name("index.md")
+            doc_path = module_path + ".md"
 
-    # Skip if this is a manual override
-    relative_doc = full_doc_path.relative_to("sdk-reference/python").as_posix()
-    if relative_doc in MANUAL_OVERRIDES:
-        continue
+        # Convert to documentation path
+        full_doc_path = "sdk-reference/python/" + doc_path
 
-    # Build navigation entry
-    if parts:
-        nav[parts] = doc_path.as_posix()
-    else:
-        nav[("index",)] = doc_path.as_posix()
+        # Skip if this is a manual override
+        if doc_path in MANUAL_OVERRIDES:
+            continue
+
+        # Record the navigation entry; the nav tree is built once at the end
+        nav_entries.append((parts or ("index",), doc_path))
 
-    # Generate the module identifier for mkdocstrings
-    identifier = ".".join(parts) if parts else PACKAGE_NAME
+        # Generate the module identifier for mkdocstrings
+        identifier = ".".join(parts) if parts else PACKAGE_NAME
 
-    # Get title
-    title = get_module_title(parts, is_package)
+        # Get title
+        title = get_module_title(parts, is_package)
 
-    # Generate the markdown file content
-    with mkdocs_gen_files.open(full_doc_path, "w") as fd:
-        # Write title
-        fd.write(f"# {title}\n\n")
+        # Generate the markdown file content, emitted with a single write
+        buf = [b"# ", title.encode(), b"\n\n"]
 
         # Add breadcrumb for nested modules
-        if len(parts) > 1:
-            breadcrumb_parts = []
-            for i, part in enumerate(parts[:-1]):
-                # Calculate relative path from current file to this part's index.md
-                # e.g., from griddy/nfl/sdk.md: griddy->../index.md, nfl->index.md
-                rel_path = "../" * (len(parts) - i - 2) + "index.md"
-                breadcrumb_parts.append(f"[{part}]({rel_path})")
-            breadcrumb_parts.append(f"**{parts[-1]}**")
-            fd.write(f"*{' / '.join(breadcrumb_parts)}*\n\n")
+        if GEN_BREADCRUMBS and len(parts) > 1:
+            # Link each ancestor to its index.md relative to the current file
+            # e.g., from griddy/nfl/sdk.md: griddy->../index.md, nfl->index.md
+            depth = len(parts) - 1
+            breadcrumb = " / ".join(
+                f"[{part}]({'../' * (depth - i - 1)}index.md)"
+                for i, part in enumerate(parts[:-1])
+            )
+            buf.append(f"*{breadcrumb} / **{parts[-1]}***\n\n".encode())
 
         # Add module docstring notice for packages
+        encoded_id = identifier.encode()
         if is_package:
-            fd.write(f"::: {identifier}\n")
-            fd.write("    options:\n")
-            fd.write("      show_root_heading: false\n")
-            fd.write("      show_root_toc_entry: false\n")
-            fd.write("      members: false\n")
-            fd.write("\n---\n\n")
-            fd.write("## Module Contents\n\n")
-            fd.write(f"::: {identifier}\n")
-            fd.write("    options:\n")
-            fd.write("      show_root_heading: false\n")
-            fd.write("      show_submodules: false\n")
+            buf.append(_PACKAGE_TMPL % (encoded_id, encoded_id))
         else:
-            # Regular module
-            fd.write(f"::: {identifier}\n")
+            buf.append(_MODULE_TMPL % encoded_id)
+
+        # Point the edit path at the actual source file
+        edit_path = edit_prefix + module_path + ".py"
+
+        pages.append((full_doc_path, b"".join(buf), edit_path))
+
+    # Navigation builder for literate-nav
+    nav = mkdocs_gen_files.Nav()
+    nav_entries.sort()
+    for parts, doc_path in nav_entries:
+        nav[parts] = doc_path
+
+    return pages, "".join(nav.build_literate_nav()).encode()
+
+
+# Without a cloned SDK (e.g. a local preview) there is nothing to document.
+# The warning fails `mkdocs build --strict`, so CI still catches a missing clone.
+if not src.is_dir():
+    log.warning("Python SDK source not found at %s; skipping API reference", src)
+    sys.exit()
+
+# Walk the source tree
+py_files = list(walk_py(src_str))
+py_files.sort()
+
+pages, summary = render_pages(py_files)
 
-    # Set the edit path to point to the actual source file
-    mkdocs_gen_files.set_edit_path(full_doc_path, path.relative_to(src.parent.parent))
+for full_doc_path, content, edit_path in pages:
+    write_if_changed(full_doc_path, content)
+    mkdocs_gen_files.set_edit_path(full_doc_path, edit_path)
 
 # Generate the navigation file for literate-nav plugin
-with mkdocs_gen_files.open("sdk-reference/python/SUMMARY.md", "w") as nav_file:
-    nav_file.writelines(nav.build_literate_nav())
\ No newline at end of file
+write_if_changed("sdk-reference/python/SUMMARY.md", summary)